@@ -0,0 +1,203 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False
+"""
+_board_kernels.pyx
+Cython version of the kernels in board_kernels.py.
+board.py uses this module if it has been built, and falls back to
+board_kernels.py otherwise. Build it in place with
+    cythonize -i _board_kernels.pyx
+
+The functions take the same arguments and return the same results
+as their counterparts in board_kernels.py. The arrays are passed as
+contiguous typed memoryviews:
+    board: int8, block_id and block_libs: int16,
+    all other arrays: int32.
+"""
+
+from board_base import BLACK, WHITE, EMPTY, BORDER
+
+cdef int C_BLACK = BLACK
+cdef int C_WHITE = WHITE
+cdef int C_EMPTY = EMPTY
+cdef int C_BORDER = BORDER
+
+# Eye lookup tables, see board_kernels._build_eye_tables
+cdef unsigned char EYE_LUT[3][256]
+cdef unsigned char DIAG_LUT[3][256]
+
+
+cdef void _build_eye_tables():
+    cdef int key, i, c, color, opp_color, at_edge, all_own, opp_count
+    for key in range(256):
+        for color in range(3):
+            EYE_LUT[color][key] = 0
+            DIAG_LUT[color][key] = 0
+        for color in (C_BLACK, C_WHITE):
+            opp_color = C_WHITE + C_BLACK - color
+            at_edge = 0
+            all_own = 1
+            opp_count = 0
+            for i in range(4):
+                c = (key >> (2 * i)) & 3
+                if c == C_BORDER:
+                    at_edge = 1
+                elif c != color:
+                    all_own = 0
+                if c == opp_color:
+                    opp_count += 1
+            EYE_LUT[color][key] = all_own
+            DIAG_LUT[color][key] = opp_count <= 1 - at_edge
+
+
+_build_eye_tables()
+
+
+cdef int _connected_component(const signed char[::1] board, const int[::1] nb_flat,
+                              const int[::1] nb_starts, int point, int[::1] visited,
+                              int epoch, int[::1] stack) noexcept nogil:
+    cdef int color = board[point]
+    cdef int count = 1
+    cdef int i = 0
+    cdef int j, p, nb
+    visited[point] = epoch
+    stack[0] = point
+    while i < count:
+        p = stack[i]
+        i += 1
+        for j in range(nb_starts[p], nb_starts[p + 1]):
+            nb = nb_flat[j]
+            if board[nb] == color and visited[nb] != epoch:
+                visited[nb] = epoch
+                stack[count] = nb
+                count += 1
+    return count
+
+
+cdef int _count_liberties(const signed char[::1] board, const int[::1] nb_flat,
+                          const int[::1] nb_starts, const int[::1] stones, int count,
+                          int[::1] seen, int epoch) noexcept nogil:
+    cdef int liberties = 0
+    cdef int i, k, stone, nb
+    for k in range(count):
+        stone = stones[k]
+        for i in range(nb_starts[stone], nb_starts[stone + 1]):
+            nb = nb_flat[i]
+            if board[nb] == C_EMPTY and seen[nb] != epoch:
+                seen[nb] = epoch
+                liberties += 1
+    return liberties
+
+
+def is_surrounded(const signed char[::1] board, const int[::1] nb_flat,
+                  const int[::1] nb_starts, int point, int color):
+    """
+    check whether empty point is surrounded by stones of color
+    (or BORDER) neighbors
+    """
+    cdef int i, nb_color
+    for i in range(nb_starts[point], nb_starts[point + 1]):
+        nb_color = board[nb_flat[i]]
+        if nb_color != C_BORDER and nb_color != color:
+            return False
+    return True
+
+
+def is_eye(const signed char[::1] board, const int[::1] nb_flat, const int[::1] nb_starts,
+           const int[::1] diag_flat, int point, int color):
+    """
+    Check if point is a simple eye for color, using the eye lookup tables
+    """
+    cdef int start = nb_starts[point]
+    cdef int nb_key = 0
+    cdef int diag_key = 0
+    cdef int i
+    for i in range(4):
+        nb_key |= board[nb_flat[start + i]] << (2 * i)
+        diag_key |= board[diag_flat[4 * point + i]] << (2 * i)
+    return (EYE_LUT[color][nb_key] & DIAG_LUT[color][diag_key]) != 0
+
+
+def connected_component(const signed char[::1] board, const int[::1] nb_flat,
+                        const int[::1] nb_starts, int point, int[::1] visited,
+                        int epoch, int[::1] stack):
+    """
+    Find the connected component of the given point.
+    Marks it with epoch in visited, stores it in stack[:count]
+    and returns count.
+    """
+    return _connected_component(board, nb_flat, nb_starts, point, visited, epoch, stack)
+
+
+def has_liberty(const signed char[::1] board, const int[::1] nb_flat,
+                const int[::1] nb_starts, const int[::1] stones, int count):
+    """
+    Check if the block given by the points stones[:count] has any liberty.
+    """
+    cdef int i, k, stone
+    for k in range(count):
+        stone = stones[k]
+        for i in range(nb_starts[stone], nb_starts[stone + 1]):
+            if board[nb_flat[i]] == C_EMPTY:
+                return True
+    return False
+
+
+def count_liberties(const signed char[::1] board, const int[::1] nb_flat,
+                    const int[::1] nb_starts, const int[::1] stones, int count,
+                    int[::1] seen, int epoch):
+    """
+    Count the liberties of the block given by the points stones[:count].
+    """
+    return _count_liberties(board, nb_flat, nb_starts, stones, count, seen, epoch)
+
+
+def is_legal_move(const signed char[::1] board, const int[::1] nb_flat,
+                  const int[::1] nb_starts, const short[::1] block_id,
+                  const short[::1] block_libs, int point, int color):
+    """
+    Check whether color can play on the empty point
+    without capturing and without suicide.
+    """
+    cdef bint has_liberty = False
+    cdef int i, nb, nb_color
+    for i in range(nb_starts[point], nb_starts[point + 1]):
+        nb = nb_flat[i]
+        nb_color = board[nb]
+        if nb_color == C_EMPTY:
+            has_liberty = True
+        elif nb_color == color:
+            if block_libs[block_id[nb]] > 1:
+                has_liberty = True
+        elif nb_color != C_BORDER:
+            if block_libs[block_id[nb]] == 1:
+                return False
+    return has_liberty
+
+
+def place_stone(signed char[::1] board, const int[::1] nb_flat, const int[::1] nb_starts,
+                short[::1] block_id, short[::1] block_libs, int point, int color,
+                int[::1] visited, int epoch, int[::1] stack, int[::1] seen):
+    """
+    Put a stone of color on the empty point and update the block tables.
+    Assumes the move is legal, so nothing is captured.
+    """
+    cdef int opp_color = C_WHITE + C_BLACK - color
+    cdef int start = nb_starts[point]
+    cdef int i, j, k, nb, root, count
+    cdef bint counted
+    with nogil:
+        board[point] = color
+        for i in range(start, nb_starts[point + 1]):
+            nb = nb_flat[i]
+            if board[nb] == opp_color:
+                root = block_id[nb]
+                counted = False
+                for j in range(start, i):
+                    if board[nb_flat[j]] == opp_color and block_id[nb_flat[j]] == root:
+                        counted = True
+                if not counted:
+                    block_libs[root] -= 1
+        count = _connected_component(board, nb_flat, nb_starts, point, visited, epoch, stack)
+        for k in range(count):
+            block_id[stack[k]] = point
+        block_libs[point] = _count_liberties(board, nb_flat, nb_starts, stack, count,
+                                             seen, epoch)
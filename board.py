@@ -13,7 +13,7 @@ The board uses a 1-dimensional representation with padding
 """
 
 import numpy as np
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from board_base import (
     board_array_size,
@@ -24,13 +24,33 @@ from board_base import (
     where1d,
     BLACK,
     WHITE,
+    DEBUG,
     EMPTY,
     BORDER,
     MAXSIZE,
     NO_POINT,
     GO_COLOR,
     GO_POINT,
+    BOARD_DTYPE,
+    POINT_DTYPE,
 )
+try:
+    # compiled Cython kernels, see _board_kernels.pyx
+    import _board_kernels as kernels
+except ImportError:
+    import board_kernels as kernels
+
+"""
+Number of slots in the direct-mapped cache of is_legal results.
+Must be a power of 2.
+"""
+LEGAL_CACHE_SIZE: int = 1 << 16
+
+"""
+Values stored in the is_legal cache. A slot with key 0 is unused.
+"""
+CACHED_ILLEGAL: int = 1
+CACHED_LEGAL: int = 2
 
 
 """
@@ -39,10 +59,21 @@ moves, check the end of the game, and count the acore at the end.
 The class also contains basic utility functions for writing a Go player.
 For many more utility functions, see the GoBoardUtil class in board_util.py.
 
-The board is stored as a one-dimensional array of GO_POINT in self.board.
+The board is stored as a one-dimensional array of BOARD_DTYPE in self.board.
 See GoBoardUtil.coord_to_point for explanations of the array encoding.
 """
 class GoBoard(object):
+    # Empty board arrays, built once for each board size
+    _empty_boards: Dict[int, np.ndarray] = {}
+    # Neighbor tables (neighbor_flat, neighbor_starts,
+    # neighbors_4, diag_neighbors_4, diag_flat),
+    # built once for each board size. They are never modified,
+    # so all boards of the same size share them.
+    _neighbor_tables: Dict[int, Tuple[np.ndarray, ...]] = {}
+    # Zobrist keys and the is_legal cache (zobrist, cache_keys, cache_values),
+    # built once for each board size and shared by all boards of that size.
+    _hash_tables: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
     def __init__(self, size: int):
         """
         Creates a Go board of given size
@@ -59,17 +90,63 @@ class GoBoard(object):
         self.WE: int = 1
         self.current_player: GO_COLOR = BLACK
         self.maxpoint: int = board_array_size(size)
-        self.board: np.ndarray[GO_POINT] = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
-        self._initialize_empty_points(self.board)
+        self.board: np.ndarray[BOARD_DTYPE] = self._empty_board().copy()
+        self._initialize_neighbors()
+        self._initialize_hashing()
+        self._initialize_search_buffers()
+        # block_id[stone] is the representative point of the block of stone.
+        # block_libs[block_id[stone]] is the number of liberties of the block.
+        self.block_id: np.ndarray[POINT_DTYPE] = np.full(self.maxpoint, NO_POINT,
+                                                         dtype=POINT_DTYPE)
+        self.block_libs: np.ndarray[POINT_DTYPE] = np.zeros(self.maxpoint, dtype=POINT_DTYPE)
+        # The empty points are kept in self._empty_points[:self._num_empty],
+        # in no particular order. self._empty_index is the inverse map:
+        # self._empty_points[self._empty_index[point]] == point.
+        self._empty_points: np.ndarray[GO_POINT] = \
+            where1d(self.board == EMPTY).astype(GO_POINT)
+        self._num_empty: int = len(self._empty_points)
+        self._empty_index: np.ndarray[POINT_DTYPE] = np.zeros(self.maxpoint, dtype=POINT_DTYPE)
+        self._empty_index[self._empty_points] = np.arange(self._num_empty)
+
+    def _initialize_search_buffers(self) -> None:
+        """
+        Allocate the scratch arrays used by flood fills.
+        They are private to each board, since the epoch is.
+        """
+        self._visited: np.ndarray[np.int32] = np.zeros(self.maxpoint, dtype=np.int32)
+        self._seen: np.ndarray[np.int32] = np.zeros(self.maxpoint, dtype=np.int32)
+        self._epoch: int = 0
+        self._dfs_stack: np.ndarray[np.int32] = np.empty(self.maxpoint, dtype=np.int32)
         
         
     def copy(self) -> 'GoBoard':
-        b = GoBoard(self.size)
-        assert b.NS == self.NS
-        assert b.WE == self.WE
+        """
+        Return a copy of the board.
+        Skips reset(): the neighbor tables are shared with self,
+        only the board array and the scratch buffers are new.
+        """
+        b: GoBoard = object.__new__(GoBoard)
+        b.size = self.size
+        b.NS = self.NS
+        b.WE = self.WE
         b.current_player = self.current_player
-        assert b.maxpoint == self.maxpoint
-        b.board = np.copy(self.board)
+        b.maxpoint = self.maxpoint
+        b.board = self.board.copy()
+        b.block_id = self.block_id.copy()
+        b.block_libs = self.block_libs.copy()
+        b._empty_points = self._empty_points.copy()
+        b._num_empty = self._num_empty
+        b._empty_index = self._empty_index.copy()
+        b.neighbor_flat = self.neighbor_flat
+        b.neighbor_starts = self.neighbor_starts
+        b.neighbors_4 = self.neighbors_4
+        b.diag_neighbors_4 = self.diag_neighbors_4
+        b.diag_flat = self.diag_flat
+        b._zobrist = self._zobrist
+        b._legal_cache_keys = self._legal_cache_keys
+        b._legal_cache_values = self._legal_cache_values
+        b._hash = self._hash
+        b._initialize_search_buffers()
         return b
 
         
@@ -84,25 +161,124 @@ class GoBoard(object):
     def is_legal(self, point: GO_POINT, color: GO_COLOR) -> bool:
         """
         Check whether it is legal for color to play on point
-        This method tries to play the move on a temporary copy of the board.
-        This prevents the board from being modified by the move
+        Uses the liberty counts in self.block_libs, so the board
+        is not modified and no flood fill is needed.
+        The result is cached by the Zobrist hash of the position
+        after the move.
         """
-        board_copy: GoBoard = self.copy()
-        can_play_move = board_copy.play_move(point, color)
+        if not is_black_white(color):
+            return False
+        board: np.ndarray[BOARD_DTYPE] = self.board
+        if board[point] != EMPTY:
+            return False
+        cache_keys: np.ndarray = self._legal_cache_keys
+        cache_values: np.ndarray = self._legal_cache_values
+        key: int = self._hash ^ int(self._zobrist[point, color])
+        slot: int = key & (LEGAL_CACHE_SIZE - 1)
+        if cache_keys[slot] == key:
+            can_play_move: bool = cache_values[slot] == CACHED_LEGAL
+        else:
+            can_play_move = kernels.is_legal_move(
+                board, self.neighbor_flat, self.neighbor_starts,
+                self.block_id, self.block_libs, point, color)
+            cache_keys[slot] = key
+            cache_values[slot] = CACHED_LEGAL if can_play_move else CACHED_ILLEGAL
+        if DEBUG:
+            assert can_play_move == self._is_legal_by_flood_fill(point, color)
         return can_play_move
 
+    def _is_legal_by_flood_fill(self, point: GO_POINT, color: GO_COLOR) -> bool:
+        """
+        Reference legality check for DEBUG mode, independent of the
+        block tables and the is_legal cache: plays the move on a copy
+        of the board and flood-fills the neighbor opponent blocks
+        (capture) and the block of the new stone (suicide).
+        """
+        board_copy: GoBoard = self.copy()
+        board_copy.board[point] = color
+        opp_color: GO_COLOR = opponent(color)
+        for nb in board_copy._neighbors(point):
+            if board_copy.board[nb] == opp_color \
+                    and not board_copy._has_liberty(board_copy._block_of(nb)):
+                return False
+        return board_copy._has_liberty(board_copy._block_of(point))
+
+    def _check_block_tables(self) -> None:
+        """
+        Consistency check for DEBUG mode: recount the block and the
+        liberties of every stone by flood fill and compare them
+        with self.block_id and self.block_libs.
+        """
+        board: np.ndarray[BOARD_DTYPE] = self.board
+        for stone in where1d((board == BLACK) | (board == WHITE)):
+            count: int = self._flood_fill(stone)
+            block: np.ndarray = self._dfs_stack[:count]
+            root: int = self.block_id[stone]
+            assert (self.block_id[block] == root).all()
+            liberties: int = kernels.count_liberties(
+                board, self.neighbor_flat, self.neighbor_starts,
+                self._dfs_stack, count, self._seen, self._epoch)
+            assert self.block_libs[root] == liberties
+
         
            
     def get_empty_points(self) -> np.ndarray:
         """
         Return:
-            The empty points on the board
+            The empty points on the board, in no particular order.
+            Read from the incrementally maintained list, without a board scan.
+        """
+        return self._empty_points[:self._num_empty].copy()
+
+    def _remove_empty_point(self, point: GO_POINT) -> None:
+        """
+        Remove point from the empty point list in O(1),
+        by moving the last empty point into its slot.
+        """
+        index: int = self._empty_index[point]
+        self._num_empty -= 1
+        last: int = self._empty_points[self._num_empty]
+        self._empty_points[index] = last
+        self._empty_index[last] = index
+
+    def legal_mask(self, color: GO_COLOR) -> np.ndarray:
+        """
+        Return:
+            Boolean mask of the legal moves for color,
+            computed for the whole board at once.
+            Same test as is_legal: a move is illegal if it fills the
+            last liberty of a neighbor opponent block (capture),
+            or if it has no liberty after merging with its own
+            neighbor blocks (suicide).
         """
-        return where1d(self.board == EMPTY)
+        board: np.ndarray[BOARD_DTYPE] = self.board
+        if not is_black_white(color):
+            return np.zeros(board.shape, dtype=bool)
+        nb_colors: np.ndarray = board[self.neighbors_4]
+        # only meaningful where nb_colors is BLACK or WHITE
+        nb_libs: np.ndarray = self.block_libs[self.block_id[self.neighbors_4]]
+        captures: np.ndarray = ((nb_colors == opponent(color)) & (nb_libs == 1)).any(axis=1)
+        has_liberty: np.ndarray = ((nb_colors == EMPTY)
+                                   | ((nb_colors == color) & (nb_libs > 1))).any(axis=1)
+        return (board == EMPTY) & has_liberty & ~captures
+
+    def eye_mask(self, color: GO_COLOR) -> np.ndarray:
+        """
+        Return:
+            Boolean mask of the empty points that are simple eyes for color,
+            computed for the whole board at once. Same test as is_eye.
+        """
+        board: np.ndarray[BOARD_DTYPE] = self.board
+        nb_colors: np.ndarray = board[self.neighbors_4]
+        diag_colors: np.ndarray = board[self.diag_neighbors_4]
+        surrounded: np.ndarray = ((nb_colors == color) | (nb_colors == BORDER)).all(axis=1)
+        at_edge: np.ndarray = (diag_colors == BORDER).any(axis=1)
+        false_count: np.ndarray = (diag_colors == opponent(color)).sum(axis=1)
+        return (board == EMPTY) & surrounded & (false_count <= 1 - at_edge)
 
     def row_start(self, row: int) -> int:
-        assert row >= 1
-        assert row <= self.size
+        if DEBUG:
+            assert 1 <= row <= self.size
         return row * self.NS + 1
         
         
@@ -113,26 +289,84 @@ class GoBoard(object):
         ---------
         board: numpy array, filled with BORDER
         """
-        for row in range(1, self.size + 1):
-            start: int = self.row_start(row)
-            board_array[start : start + self.size] = EMPTY
+        lines: np.ndarray = np.arange(1, self.size + 1)
+        points: np.ndarray = (lines[:, None] * self.NS + lines[None, :]).ravel()
+        board_array[points] = EMPTY
+
+    def _empty_board(self) -> np.ndarray:
+        """
+        Return the empty board array for self.size.
+        It is cached and shared, so callers must copy it before modifying.
+        """
+        board_array = GoBoard._empty_boards.get(self.size)
+        if board_array is None:
+            board_array = np.full(self.maxpoint, BORDER, dtype=BOARD_DTYPE)
+            self._initialize_empty_points(board_array)
+            GoBoard._empty_boards[self.size] = board_array
+        return board_array
+
+    def _initialize_neighbors(self) -> None:
+        """
+        Set up the neighbor tables for self.size, building them
+        the first time this size is used.
+        self.neighbors_4[point] and self.diag_neighbors_4[point] are
+        the four neighbors and the four diagonal neighbors of point.
+        Their rows for BORDER points are filled with point 0,
+        which is a BORDER point, so they can be gathered for the whole board.
+        The neighbors of point are also in CSR form:
+        self.neighbor_flat[self.neighbor_starts[point] : self.neighbor_starts[point + 1]]
+        Points on the board have four neighbors, BORDER points have none.
+        The diagonal neighbors of point are
+        self.diag_flat[4 * point : 4 * point + 4].
+        """
+        tables = GoBoard._neighbor_tables.get(self.size)
+        if tables is None:
+            on_board: np.ndarray = self._empty_board() != BORDER
+            points: np.ndarray[GO_POINT] = where1d(on_board).astype(GO_POINT)
+            NS: int = self.NS
+            neighbors_4: np.ndarray[GO_POINT] = np.zeros((self.maxpoint, 4), dtype=GO_POINT)
+            neighbors_4[points] = np.stack(
+                [points - 1, points + 1, points - NS, points + NS], axis=1)
+            diag_neighbors_4: np.ndarray[GO_POINT] = np.zeros((self.maxpoint, 4), dtype=GO_POINT)
+            diag_neighbors_4[points] = np.stack(
+                [points - NS - 1, points - NS + 1, points + NS - 1, points + NS + 1], axis=1)
+            neighbor_starts: np.ndarray[GO_POINT] = np.zeros(self.maxpoint + 1, dtype=GO_POINT)
+            neighbor_starts[1:] = np.cumsum(4 * on_board)
+            neighbor_flat: np.ndarray[GO_POINT] = neighbors_4[points].ravel()
+            diag_flat: np.ndarray[GO_POINT] = diag_neighbors_4.ravel()
+            for table in (neighbors_4, diag_neighbors_4, neighbor_starts, neighbor_flat,
+                          diag_flat):
+                table.flags.writeable = False
+            tables = (neighbor_flat, neighbor_starts, neighbors_4, diag_neighbors_4, diag_flat)
+            GoBoard._neighbor_tables[self.size] = tables
+        (self.neighbor_flat, self.neighbor_starts,
+         self.neighbors_4, self.diag_neighbors_4, self.diag_flat) = tables
+
+    def _initialize_hashing(self) -> None:
+        """
+        Set up the Zobrist keys and the is_legal cache for self.size,
+        building them the first time this size is used.
+        self._zobrist[point, color] is the key of a stone of color on point.
+        self._hash is the XOR of the keys of all stones on the board.
+        """
+        tables = GoBoard._hash_tables.get(self.size)
+        if tables is None:
+            zobrist: np.ndarray = np.random.default_rng(0).integers(
+                1, 2 ** 63, (self.maxpoint, 3), dtype=np.uint64)
+            zobrist[:, EMPTY] = 0
+            cache_keys: np.ndarray = np.zeros(LEGAL_CACHE_SIZE, dtype=np.uint64)
+            cache_values: np.ndarray = np.zeros(LEGAL_CACHE_SIZE, dtype=np.uint8)
+            tables = (zobrist, cache_keys, cache_values)
+            GoBoard._hash_tables[self.size] = tables
+        self._zobrist, self._legal_cache_keys, self._legal_cache_values = tables
+        self._hash: int = 0
 
     def is_eye(self, point: GO_POINT, color: GO_COLOR) -> bool:
         """
         Check if point is a simple eye for color
         """
-        if not self._is_surrounded(point, color):
-            return False
-        # Eye-like shape. Check diagonals to detect false eye
-        opp_color = opponent(color)
-        false_count = 0
-        at_edge = 0
-        for d in self._diag_neighbors(point):
-            if self.board[d] == BORDER:
-                at_edge = 1
-            elif self.board[d] == opp_color:
-                false_count += 1
-        return false_count <= 1 - at_edge  # 0 at edge, 1 in center
+        return kernels.is_eye(self.board, self.neighbor_flat, self.neighbor_starts,
+                              self.diag_flat, point, color)
         
         
     def _is_surrounded(self, point: GO_POINT, color: GO_COLOR) -> bool:
@@ -140,118 +374,117 @@ class GoBoard(object):
         check whether empty point is surrounded by stones of color
         (or BORDER) neighbors
         """
-        for nb in self._neighbors(point):
-            nb_color = self.board[nb]
-            if nb_color != BORDER and nb_color != color:
-                return False
-        return True
+        return kernels.is_surrounded(self.board, self.neighbor_flat, self.neighbor_starts,
+                                     point, color)
 
-    def _has_liberty(self, block: np.ndarray) -> bool:
+    def _has_liberty(self, block: Tuple[np.ndarray, int]) -> bool:
         """
         Check if the given block has any liberty.
-        block is a numpy boolean array
+        block is a (visited, epoch) pair as returned by connected_component
         """
-        for stone in where1d(block):
-            empty_nbs = self.neighbors_of_color(stone, EMPTY)
-            if empty_nbs:
-                return True
-        return False
+        visited, epoch = block
+        stones: np.ndarray[GO_POINT] = where1d(visited == epoch).astype(GO_POINT)
+        return kernels.has_liberty(self.board, self.neighbor_flat, self.neighbor_starts,
+                                   stones, len(stones))
         
         
-    def _block_of(self, stone: GO_POINT) -> np.ndarray:
+    def _block_of(self, stone: GO_POINT) -> Tuple[np.ndarray, int]:
         """
         Find the block of given stone
-        Returns a board of boolean markers which are set for
-        all the points in the block 
+        Returns a (visited, epoch) pair. The points in the block
+        are those with visited[point] == epoch
         """
-        color: GO_COLOR = self.get_color(stone)
-        assert is_black_white(color)
+        if DEBUG:
+            assert is_black_white(self.get_color(stone))
         return self.connected_component(stone)
 
-    def connected_component(self, point: GO_POINT) -> np.ndarray:
+    def connected_component(self, point: GO_POINT) -> Tuple[np.ndarray, int]:
         """
         Find the connected component of the given point.
+        Returns a (visited, epoch) pair. The points in the component
+        are those with visited[point] == epoch.
+        visited is reused by the next call, so use the result right away.
         """
-        marker = np.full(self.maxpoint, False, dtype=np.bool_)
-        pointstack = [point]
-        color: GO_COLOR = self.get_color(point)
-        assert is_black_white_empty(color)
-        marker[point] = True
-        while pointstack:
-            p = pointstack.pop()
-            neighbors = self.neighbors_of_color(p, color)
-            for nb in neighbors:
-                if not marker[nb]:
-                    marker[nb] = True
-                    pointstack.append(nb)
-        return marker
-        
-        
-    def _detect_and_process_capture(self, nb_point: GO_POINT) -> GO_POINT:
+        if DEBUG:
+            assert is_black_white_empty(self.get_color(point))
+        self._flood_fill(point)
+        return self._visited, self._epoch
+
+    def _flood_fill(self, point: GO_POINT) -> int:
         """
-        Check whether opponent block on nb_point is captured.
-        If yes, remove the stones.
-        Returns the stone if only a single stone was captured,
-        and returns NO_POINT otherwise.
+        Mark the connected component of point with a new epoch in
+        self._visited. Its points are left in self._dfs_stack[:count].
+        Returns count.
         """
-        opp_block = self._block_of(nb_point)
-        return not self._has_liberty(opp_block)
+        return kernels.connected_component(self.board, self.neighbor_flat, self.neighbor_starts,
+                                           point, self._visited, self._next_epoch(),
+                                           self._dfs_stack)
 
+    def _next_epoch(self) -> int:
+        """
+        Start a new epoch for marking self._visited and self._seen.
+        Clears both arrays when the epoch would overflow.
+        """
+        self._epoch += 1
+        if self._epoch == np.iinfo(np.int32).max:
+            self._visited.fill(0)
+            self._seen.fill(0)
+            self._epoch = 1
+        return self._epoch
 
     def play_move(self, point: GO_POINT, color: GO_COLOR) -> bool:
         """
         Play a move of color on point
         Returns whether move was legal
         """
-        
-        assert is_black_white(color)
-        
-        if self.board[point] != EMPTY:
+        if not is_black_white(color):
             return False
-            
-        opp_color = opponent(color)
-        in_enemy_eye = self._is_surrounded(point, opp_color)
-        self.board[point] = color
-        neighbors = self._neighbors(point)
-        
-        #check for capturing
-        for nb in neighbors:
-            if self.board[nb] == opp_color:
-                captured = self._detect_and_process_capture(nb)
-                if captured:
-                #undo capturing move
-                    self.board[point] = EMPTY
-                    return False
-                    
-                    
-        #check for suicide
-        block = self._block_of(point)
-        if not self._has_liberty(block):  
-            # undo suicide move
-            self.board[point] = EMPTY
+        board: np.ndarray[BOARD_DTYPE] = self.board
+        if board[point] != EMPTY:
             return False
-        
+        nb_flat: np.ndarray[GO_POINT] = self.neighbor_flat
+        nb_starts: np.ndarray[GO_POINT] = self.neighbor_starts
+        block_id: np.ndarray[POINT_DTYPE] = self.block_id
+        block_libs: np.ndarray[POINT_DTYPE] = self.block_libs
+        if not kernels.is_legal_move(board, nb_flat, nb_starts,
+                                     block_id, block_libs, point, color):
+            # the move would capture or be suicide
+            return False
+        kernels.place_stone(board, nb_flat, nb_starts, block_id, block_libs, point, color,
+                            self._visited, self._next_epoch(), self._dfs_stack, self._seen)
+        # no stones are ever captured, so points only stop being empty
+        self._remove_empty_point(point)
+        self._hash ^= int(self._zobrist[point, color])
+        if DEBUG:
+            self._check_block_tables()
         self.current_player = opponent(color)
         return True
 
     def neighbors_of_color(self, point: GO_POINT, color: GO_COLOR) -> List:
         """ List of neighbors of point of given color """
+        board: np.ndarray[BOARD_DTYPE] = self.board
+        nb_flat: np.ndarray[GO_POINT] = self.neighbor_flat
+        nb_starts: np.ndarray[GO_POINT] = self.neighbor_starts
         nbc: List[GO_POINT] = []
-        for nb in self._neighbors(point):
-            if self.get_color(nb) == color:
+        for i in range(nb_starts[point], nb_starts[point + 1]):
+            nb = nb_flat[i]
+            if board[nb] == color:
                 nbc.append(nb)
         return nbc
 
-    def _neighbors(self, point: GO_POINT) -> List:
-        """ List of all four neighbors of the point """
-        return [point - 1, point + 1, point - self.NS, point + self.NS]
+    def _neighbors(self, point: GO_POINT) -> np.ndarray:
+        """
+        All four neighbors of the point on the board,
+        as a read-only view into the shared neighbors_4 table
+        """
+        return self.neighbors_4[point]
 
-    def _diag_neighbors(self, point: GO_POINT) -> List:
-        """ List of all four diagonal neighbors of point """
-        return [point - self.NS - 1,
-                point - self.NS + 1,
-                point + self.NS - 1,
-                point + self.NS + 1]
+    def _diag_neighbors(self, point: GO_POINT) -> np.ndarray:
+        """
+        All four diagonal neighbors of the point on the board,
+        as a read-only view into the shared diag_neighbors_4 table
+        """
+        return self.diag_neighbors_4[point]
 
     def last_board_moves(self) -> List:
         """
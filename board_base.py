@@ -27,6 +27,13 @@ def is_black_white_empty(color: GO_COLOR) -> bool:
 def opponent(color: GO_COLOR) -> GO_COLOR:
     return WHITE + BLACK - color
 
+"""
+Set DEBUG to True to run the consistency checks in the
+inner-loop functions of GoBoard. They are off by default,
+since these functions run many times per move.
+"""
+DEBUG: bool = False
+
 """
 A GO_POINT is a point on a Go board.
 It is encoded as a 32-bit integer, using the numpy type.
@@ -34,6 +41,16 @@ It is encoded as a 32-bit integer, using the numpy type.
 GO_POINT = np.int32
 
 
+"""
+Compact numpy types for the arrays that are copied with every board.
+BOARD_DTYPE holds the colors of the points in GoBoard.board,
+all colors fit in 8 bits.
+POINT_DTYPE holds points in the block tables. The largest array index,
+board_array_size(MAXSIZE) - 1, fits in 16 bits.
+"""
+BOARD_DTYPE = np.int8
+POINT_DTYPE = np.int16
+
 """
 Encoding of "not a real point", used as a marker
 """
@@ -56,14 +73,13 @@ def board_array_size(size: int) -> int:
     return size * size + 3 * (size + 1)
 
 """
-where1d: Helper function for using np.where with 1-d arrays.
-The result of np.where is a tuple which contains the indices 
-of elements that fulfill the condition.
-For 1-d arrays, this is of type Tuple[ndarray].
-The [0] indexing is needed to extract the ndarray result from the singleton tuple.
+where1d: Helper function for finding the indices of the elements
+of a 1-d array that fulfill the condition.
+Uses np.flatnonzero, which returns the ndarray directly instead of
+the singleton tuple returned by np.where.
 """
 def where1d(condition: np.ndarray) -> np.ndarray:
-    return np.where(condition)[0]
+    return np.flatnonzero(condition)
 
 def coord_to_point(row: int, col: int, board_size: int) -> GO_POINT:
     """
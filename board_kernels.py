@@ -0,0 +1,192 @@
+"""
+board_kernels.py
+Low-level kernels for the hot operations of GoBoard.
+This file is imported by board.py.
+
+The kernels are plain functions over raw numpy arrays:
+    board: the 1-d padded board array (see board_base.coord_to_point)
+    nb_flat, nb_starts: the neighbor table in CSR form.
+        The neighbors of point are
+        nb_flat[nb_starts[point] : nb_starts[point + 1]]
+    diag_flat: the four diagonal neighbors of point are
+        diag_flat[4 * point : 4 * point + 4]
+    block_id, block_libs: the block tables.
+        block_id[stone] is the representative point of the block of stone,
+        block_libs[block_id[stone]] is the number of liberties of that block.
+If Numba is installed, the kernels are compiled with njit.
+Otherwise they run as regular Python functions.
+"""
+
+import numpy as np
+
+from board_base import BLACK, WHITE, EMPTY, BORDER
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """ Numba is not available: leave the function as it is """
+        def decorator(function):
+            return function
+        return decorator
+
+
+def _build_eye_tables():
+    """
+    Build the lookup tables for is_eye.
+    A key packs the colors of four points, 2 bits each:
+    key = c0 | c1 << 2 | c2 << 4 | c3 << 6
+    EYE_LUT[color, key]: all four neighbors are color or BORDER.
+    DIAG_LUT[color, key]: the four diagonals do not make a false eye,
+    at most one opponent stone in the center and none at the edge.
+    """
+    eye_lut = np.zeros((3, 256), dtype=np.uint8)
+    diag_lut = np.zeros((3, 256), dtype=np.uint8)
+    for key in range(256):
+        colors = [(key >> (2 * i)) & 3 for i in range(4)]
+        at_edge = int(BORDER in colors)
+        for color in (BLACK, WHITE):
+            opp_color = WHITE + BLACK - color
+            eye_lut[color, key] = all(c == color or c == BORDER for c in colors)
+            diag_lut[color, key] = colors.count(opp_color) <= 1 - at_edge
+    return eye_lut, diag_lut
+
+
+EYE_LUT, DIAG_LUT = _build_eye_tables()
+
+
+@njit(cache=True, nogil=True)
+def is_surrounded(board, nb_flat, nb_starts, point, color):
+    """
+    check whether empty point is surrounded by stones of color
+    (or BORDER) neighbors
+    """
+    for i in range(nb_starts[point], nb_starts[point + 1]):
+        nb_color = board[nb_flat[i]]
+        if nb_color != BORDER and nb_color != color:
+            return False
+    return True
+
+
+@njit(cache=True, nogil=True)
+def is_eye(board, nb_flat, nb_starts, diag_flat, point, color):
+    """
+    Check if point is a simple eye for color.
+    Packs the colors of the four neighbors and of the four diagonals
+    into two keys and looks both up in the eye tables, without branches.
+    """
+    start = nb_starts[point]
+    nb_key = 0
+    diag_key = 0
+    for i in range(4):
+        nb_key |= int(board[nb_flat[start + i]]) << (2 * i)
+        diag_key |= int(board[diag_flat[4 * point + i]]) << (2 * i)
+    return (EYE_LUT[color, nb_key] & DIAG_LUT[color, diag_key]) != 0
+
+
+@njit(cache=True, nogil=True)
+def connected_component(board, nb_flat, nb_starts, point, visited, epoch, stack):
+    """
+    Find the connected component of the given point.
+    Points are marked by setting visited[p] = epoch.
+    The points of the component are stored in stack[:count],
+    and count is returned.
+    """
+    color = board[point]
+    visited[point] = epoch
+    stack[0] = point
+    count = 1
+    i = 0
+    while i < count:
+        p = stack[i]
+        i += 1
+        for j in range(nb_starts[p], nb_starts[p + 1]):
+            nb = nb_flat[j]
+            if board[nb] == color and visited[nb] != epoch:
+                visited[nb] = epoch
+                stack[count] = nb
+                count += 1
+    return count
+
+
+@njit(cache=True, nogil=True)
+def has_liberty(board, nb_flat, nb_starts, stones, count):
+    """
+    Check if the block given by the points stones[:count] has any liberty.
+    """
+    for k in range(count):
+        stone = stones[k]
+        for i in range(nb_starts[stone], nb_starts[stone + 1]):
+            if board[nb_flat[i]] == EMPTY:
+                return True
+    return False
+
+
+@njit(cache=True, nogil=True)
+def count_liberties(board, nb_flat, nb_starts, stones, count, seen, epoch):
+    """
+    Count the liberties of the block given by the points stones[:count].
+    Each liberty is counted once: it is marked by setting seen[p] = epoch.
+    """
+    liberties = 0
+    for k in range(count):
+        stone = stones[k]
+        for i in range(nb_starts[stone], nb_starts[stone + 1]):
+            nb = nb_flat[i]
+            if board[nb] == EMPTY and seen[nb] != epoch:
+                seen[nb] = epoch
+                liberties += 1
+    return liberties
+
+
+@njit(cache=True, nogil=True)
+def is_legal_move(board, nb_flat, nb_starts, block_id, block_libs, point, color):
+    """
+    Check whether color can play on the empty point
+    without capturing and without suicide.
+    point is a liberty of all its neighbor blocks, so a neighbor block
+    has exactly 1 liberty if and only if point is its last liberty.
+    """
+    has_liberty = False
+    for i in range(nb_starts[point], nb_starts[point + 1]):
+        nb = nb_flat[i]
+        nb_color = board[nb]
+        if nb_color == EMPTY:
+            has_liberty = True
+        elif nb_color == color:
+            if block_libs[block_id[nb]] > 1:
+                has_liberty = True
+        elif nb_color != BORDER:
+            if block_libs[block_id[nb]] == 1:
+                return False
+    return has_liberty
+
+
+@njit(cache=True, nogil=True)
+def place_stone(board, nb_flat, nb_starts, block_id, block_libs, point, color,
+                visited, epoch, stack, seen):
+    """
+    Put a stone of color on the empty point and update the block tables.
+    Assumes the move is legal, so nothing is captured.
+    Neighbor opponent blocks lose point as a liberty.
+    The new stone merges with its neighbor blocks of color into
+    a block with representative point, whose liberties are recounted.
+    visited and seen are marked with epoch, which must be unused.
+    """
+    board[point] = color
+    opp_color = WHITE + BLACK - color
+    start = nb_starts[point]
+    for i in range(start, nb_starts[point + 1]):
+        nb = nb_flat[i]
+        if board[nb] == opp_color:
+            root = block_id[nb]
+            counted = False
+            for j in range(start, i):
+                if board[nb_flat[j]] == opp_color and block_id[nb_flat[j]] == root:
+                    counted = True
+            if not counted:
+                block_libs[root] -= 1
+    count = connected_component(board, nb_flat, nb_starts, point, visited, epoch, stack)
+    for k in range(count):
+        block_id[stack[k]] = point
+    block_libs[point] = count_liberties(board, nb_flat, nb_starts, stack, count, seen, epoch)
@@ -6,14 +6,14 @@ Utility functions for Go board.
 import numpy as np
 import random
 from typing import List
-from board_base import GO_COLOR, GO_POINT
+from board_base import GO_COLOR, GO_POINT, where1d
 from board import GoBoard
 
 class GoBoardUtil(object):
     @staticmethod
-    def generate_legal_moves(board: GoBoard, color: GO_COLOR) -> List:
+    def generate_legal_moves(board: GoBoard, color: GO_COLOR) -> np.ndarray:
         """
-        generate a list of all legal moves on the board.
+        generate an array of all legal moves on the board.
         Does not include the Pass move.
 
         Arguments
@@ -23,13 +23,7 @@ class GoBoardUtil(object):
         color:
             the color to generate the move for.
         """
-        moves: np.ndarray[GO_POINT] = board.get_empty_points()
-        legal_moves: List[GO_POINT] = []
-        
-        for move in moves:
-            if board.is_legal(move, color):
-                legal_moves.append(move)
-        return legal_moves
+        return where1d(board.legal_mask(color))
         
         
 
@@ -48,31 +42,27 @@ class GoBoardUtil(object):
         """
         moves: np.ndarray[GO_POINT] = board.get_empty_points()
         np.random.shuffle(moves)
+        is_eye = board.is_eye
+        is_legal = board.is_legal
         for move in moves:
             legal: bool = not (
-                use_eye_filter and board.is_eye(move, color)
-            ) and board.is_legal(move, color)
+                use_eye_filter and is_eye(move, color)
+            ) and is_legal(move, color)
             if legal:
                 return move
         
         
 
     @staticmethod
-    def generate_random_moves(board: GoBoard, use_eye_filter: bool) -> List:
+    def generate_random_moves(board: GoBoard, use_eye_filter: bool) -> np.ndarray:
         """
-        Return a list of random (legal) moves with eye-filtering.
+        Return an array of random (legal) moves with eye-filtering.
         """
-        empty_points: np.ndarray[GO_POINT] = board.get_empty_points()
         color: GO_COLOR = board.current_player
-        moves: List[GO_POINT] = []
-        for move in empty_points:
-            legal: bool = \
-                not (
-                    use_eye_filter and board.is_eye(move, color)
-                ) and board.is_legal(move, color)
-            if legal:
-                moves.append(move)
-        return moves
+        moves: np.ndarray = board.legal_mask(color)
+        if use_eye_filter:
+            moves &= ~board.eye_mask(color)
+        return where1d(moves)
         
 
     @staticmethod
@@ -217,7 +217,7 @@ class GtpConnection:
         """
         board_color: str = args[0].lower()
         color: GO_COLOR = color_to_int(board_color)
-        moves: List[GO_POINT] = GoBoardUtil.generate_legal_moves(self.board, color)
+        moves: np.ndarray = GoBoardUtil.generate_legal_moves(self.board, color)
         gtp_moves: List[str] = []
         for move in moves:
             coords: Tuple[int, int] = point_to_coord(move, self.board.size)
@@ -337,7 +337,9 @@ class GtpConnection:
             if not success:
                 self.respond('illegal move')
                 return
-            else:
+            elif self._debug_mode:
+                # board2d() formats the whole numpy array,
+                # so only build the message when it is written
                 self.debug_msg(
                     "Move: {}\nBoard:\n{}\n".format(board_move, self.board2d())
                 )